@@ -116,7 +116,7 @@ def add_workout_section():
             workout = yt_extractor.get_info(url)
             if workout:
                 st.video(url)
-                if st.button("Add") and dbs.add_workout(workout)[0]:
+                if st.button("Add") and dbs.add_workout(workout.to_dict())[0]:
                     st.rerun()
         except Exception as e:
             st.error(f"Error processing video: {str(e)}")
@@ -38,11 +38,14 @@ class AuthService:
         except Exception as e:
             st.error(f"Error: {str(e)}")
 
-    def verify_password(self, email: str, password: str) -> bool:
-        """Nuclear password verification"""
+    def verify_password(
+        self, email: str, password: str, user: Optional[dict] = None
+    ) -> bool:
+        """Nuclear password verification; pass user to skip refetching its row"""
         try:
             print(f"\n🔐 NUCLEAR VERIFICATION FOR {email}")
-            user = self.dbs.get_user_by_email(email)
+            if user is None:
+                user = self.dbs.get_user_by_email(email)
             if not user:
                 print("❌ USER NOT FOUND")
                 return False
@@ -157,7 +160,7 @@ class AuthService:
             st.error("⚠️ Please verify your email first. Check your inbox.")
             return
 
-        if not self.verify_password(email, password):
+        if not self.verify_password(email, password, user=user):
             st.error("❌ Invalid credentials")
             return
 
@@ -16,7 +16,8 @@ def check_imports() -> None:
         ("mysql-connector-python", "mysql.connector", True),
         ("python-dotenv", "dotenv", True),
         ("bcrypt", "bcrypt", True),
-        ("pandas", "pandas", False),  # Only needed for exports
+        ("pyarrow", "pyarrow", False),  # Only needed for Parquet exports
+        ("pybase64", "pybase64", False),  # Faster background image encoding
         ("dnspython", "dns", True),  # For email domain validation
         ("email-validator", "email_validator", True),
     ]
@@ -4,9 +4,10 @@ import os
 import bcrypt
 import time
 import logging
+from datetime import datetime, timedelta
 import dns.resolver
 from email_validator import validate_email, EmailNotValidError
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dotenv import load_dotenv
 
 # Configure logging
@@ -18,6 +19,21 @@ logging.basicConfig(
 
 load_dotenv()
 
+# Well-known mail providers that always publish MX records; skips the DNS lookup
+_KNOWN_GOOD_DOMAINS = frozenset(
+    {
+        "gmail.com",
+        "googlemail.com",
+        "outlook.com",
+        "hotmail.com",
+        "live.com",
+        "yahoo.com",
+        "icloud.com",
+        "proton.me",
+        "protonmail.com",
+    }
+)
+
 
 class DatabaseService:
     _instance = None
@@ -118,8 +134,10 @@ class DatabaseService:
                     time VARCHAR(50),
                     title TEXT,
                     user_id VARCHAR(255),
+                    is_sent BOOLEAN DEFAULT FALSE,
                     created_at BIGINT,
                     updated_at BIGINT,
+                    INDEX idx_schedule_time (time),
                     FOREIGN KEY (email) REFERENCES users(email),
                     FOREIGN KEY (video_id) REFERENCES all_workouts(video_id)
                 )
@@ -241,10 +259,43 @@ class DatabaseService:
             if conn:
                 conn.close()
 
+    def iter_users(self, batch_size: int = 10_000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield all users in batches, paging by user_id so memory stays O(batch)"""
+        last_id = ""
+        while True:
+            conn = None
+            try:
+                conn = self.get_connection()
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(
+                    """
+                    SELECT * FROM users
+                    WHERE user_id > %s
+                    ORDER BY user_id
+                    LIMIT %s
+                """,
+                    (last_id, batch_size),
+                )
+                batch = cursor.fetchall()
+            except Error as e:
+                logging.error(f"Error fetching users after {last_id!r}: {e}")
+                raise
+            finally:
+                if conn:
+                    conn.close()
+
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]["user_id"]
+
     def verify_email_domain(self, email: str) -> bool:
         """Check if email domain has valid MX records"""
         try:
             domain = email.split("@")[1]
+            if domain.lower() in _KNOWN_GOOD_DOMAINS:
+                return True
             records = dns.resolver.resolve(domain, "MX")
             return bool(records)
         except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
@@ -514,6 +565,69 @@ class DatabaseService:
             if conn:
                 conn.close()
 
+    def get_due_reminders_with_workouts(self, hhmm: str) -> List[Dict[str, Any]]:
+        """Get unsent reminders due at hhmm joined with their workout details"""
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(
+                """
+                SELECT s.email, s.video_id, w.title, w.duration
+                FROM schedule s
+                JOIN all_workouts w ON w.video_id = s.video_id
+                WHERE s.time = %s AND s.is_sent = FALSE
+            """,
+                (hhmm,),
+            )
+            return cursor.fetchall()
+        except Error as e:
+            logging.error(f"Error fetching reminders due at {hhmm}: {e}")
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+    def get_next_reminder_datetime(
+        self, now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """Return when the soonest unsent reminder is due (today or tomorrow)"""
+        now = now or datetime.now()
+        conn = None
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                SELECT
+                    MIN(CASE WHEN time >= %s THEN time END),
+                    MIN(time)
+                FROM schedule
+                WHERE is_sent = FALSE
+            """,
+                (now.strftime("%H:%M"),),
+            )
+            later_today, earliest = cursor.fetchone()
+        except Error as e:
+            logging.error(f"Error fetching next reminder time: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+
+        next_time = later_today or earliest
+        if not next_time:
+            return None
+        try:
+            hour, minute = (int(part) for part in next_time[:5].split(":"))
+            due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            logging.error(f"Malformed schedule time: {next_time!r}")
+            return None
+        return due if later_today else due + timedelta(days=1)
+
     def save_schedule(self, email: str, schedule_data: Dict[str, Any]) -> bool:
         """Create or update a schedule"""
         conn = None
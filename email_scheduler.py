@@ -1,14 +1,15 @@
 import time
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText
 from datetime import datetime
-from database_service import dbs
 import os
-from dotenv import load_dotenv
 import logging
 import sys
+import argparse
 import ssl
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # UTF-8 encoding setup
 if sys.platform == "win32":
@@ -17,8 +18,6 @@ if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
 
-load_dotenv()
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +29,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+REMINDER_SUBJECT = "Your Workout Reminder"
+REMINDER_BODY = """Hello!
+
+Your scheduled workout is ready:
+
+{title}
+Duration: {duration} seconds
+Watch now: https://youtu.be/{video_id}
+
+Stay active!
+Your Fitness App Team
+"""
+
+# Loading the trust store is costly, so every SMTP connection shares one context
+_SSL_CONTEXT = ssl.create_default_context()
+
 
 class EmailScheduler:
     def __init__(self):
@@ -42,6 +57,14 @@ class EmailScheduler:
             "user": os.getenv("SMTP_USER"),
             "password": os.getenv("SMTP_PASS"),
         }
+        self.from_header = f"Fitness Reminder <{self.smtp_config['user']}>"
+        self.max_recipients = int(os.getenv("SMTP_MAX_RECIPIENTS", 50))
+        self.max_per_conn = int(os.getenv("SMTP_MAX_PER_CONN", 500))
+        self.max_sleep = int(os.getenv("SCHEDULER_MAX_SLEEP", 60))
+        self.pool_size = int(os.getenv("SMTP_POOL", 5))
+        self._tls = threading.local()
+        self._sessions: List[Dict[str, Any]] = []
+        self._sessions_lock = threading.Lock()
         self.validate_config()
 
     def validate_config(self):
@@ -57,135 +80,233 @@ class EmailScheduler:
     def create_smtp_connection(self) -> Optional[smtplib.SMTP]:
         """Establish SMTP connection with retry logic"""
         for attempt in range(1, self.max_retries + 1):
+            server = None
             try:
-                context = ssl.create_default_context()
                 server = smtplib.SMTP(
                     self.smtp_config["server"],
                     self.smtp_config["port"],
                     timeout=self.smtp_timeout,
                 )
-                server.starttls(context=context)
+                server.starttls(context=_SSL_CONTEXT)
                 server.login(self.smtp_config["user"], self.smtp_config["password"])
                 logger.info("SMTP connection established")
                 return server
             except Exception as e:
                 logger.warning(f"SMTP connection attempt {attempt} failed: {str(e)}")
+                if server:
+                    server.close()  # Don't leak the socket of a failed attempt
                 if attempt < self.max_retries:
                     time.sleep(self.retry_delay)
         return None
 
-    def send_email(self, to_email: str, subject: str, body: str) -> bool:
-        """Send email with proper error handling"""
+    def _session(self) -> Dict[str, Any]:
+        """Return the calling thread's SMTP session state"""
+        session = getattr(self._tls, "session", None)
+        if session is None:
+            session = self._tls.session = {"server": None, "sent": 0}
+        return session
+
+    def _get_server(self) -> Optional[smtplib.SMTP]:
+        """Return the calling thread's SMTP session, connecting on first use"""
+        session = self._session()
+        if session["server"] is None:
+            session["server"] = self.create_smtp_connection()
+            if session["server"] is not None:
+                with self._sessions_lock:
+                    self._sessions.append(session)
+        return session["server"]
+
+    def _close_session(self, session: Dict[str, Any]):
+        """Quit one SMTP session and reset its message counter"""
+        server, session["server"], session["sent"] = session["server"], None, 0
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception as e:
+            logger.debug(f"SMTP quit failed: {str(e)}")
+            server.close()
+
+    def close_smtp_connections(self):
+        """Quit every SMTP session opened since the last cleanup"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            self._close_session(session)
+
+    def build_message(self, to_header: str, subject: str, body: str) -> MIMEText:
+        """Build a plain-text message with the scheduler's From header"""
         msg = MIMEText(body, "plain", "utf-8")
         msg["Subject"] = subject
-        msg["From"] = f"Fitness Reminder <{self.smtp_config['user']}>"
-        msg["To"] = to_email
+        msg["From"] = self.from_header
+        msg["To"] = to_header
+        return msg
+
+    def send_message(self, msg: MIMEText, recipients: List[str]) -> List[str]:
+        """Send msg over this thread's SMTP session; return the accepted recipients"""
+        session = self._session()
+        for _ in range(2):
+            server = self._get_server()
+            if not server:
+                logger.error(f"No SMTP connection, could not email {recipients}")
+                return []
+            try:
+                refused = server.send_message(msg, to_addrs=recipients)
+                accepted = [r for r in recipients if r not in refused]
+                logger.info(f"Email sent to {', '.join(accepted)}")
+                session["sent"] += 1
+                if session["sent"] >= self.max_per_conn:
+                    self._close_session(session)
+                return accepted
+            except smtplib.SMTPServerDisconnected:
+                logger.warning("SMTP connection dropped, reconnecting")
+                server.close()
+                session["server"], session["sent"] = None, 0
+            except Exception as e:
+                logger.error(f"Failed to send email to {recipients}: {str(e)}")
+                return []
+        return []
 
+    def send_email(self, to_email: str, subject: str, body: str) -> bool:
+        """Send a single email over this thread's SMTP session"""
+        msg = self.build_message(to_email, subject, body)
+        return bool(self.send_message(msg, [to_email]))
+
+    def process_reminder_group(
+        self, workout: Dict[str, Any], emails: List[str]
+    ) -> List[str]:
+        """Send one reminder message for a workout to all of its due recipients"""
         try:
-            with self.create_smtp_connection() as server:
-                if server:
-                    server.send_message(msg)
-                    logger.info(f"Email sent to {to_email}")
-                    return True
-            return False
+            email_body = REMINDER_BODY.format(
+                title=workout["title"],
+                duration=workout["duration"],
+                video_id=workout["video_id"],
+            )
+
+            # Recipients go in the envelope only, so they don't see each other
+            to_header = emails[0] if len(emails) == 1 else "undisclosed-recipients:;"
+            msg = self.build_message(to_header, REMINDER_SUBJECT, email_body)
+            return self.send_message(msg, emails)
         except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
-            return False
-
-    def process_reminder(self, reminder: Dict[str, Any]) -> bool:
-        """Process and send a single reminder"""
-        try:
-            workout = dbs.get_workout_by_id(reminder["video_id"])
-            if not workout:
-                logger.error(f"Workout not found: {reminder['video_id']}")
-                return False
-
-            email_body = f"""Hello!
-
-Your scheduled workout is ready:
+            logger.error(
+                f"Error processing reminders for {workout['video_id']}: {str(e)}"
+            )
+            return []
 
-{workout['title']}
-Duration: {workout['duration']} seconds
-Watch now: https://youtu.be/{workout['video_id']}
+    def mark_reminders_sent(self, sent: List[Tuple[str, str]]) -> bool:
+        """Mark a batch of (email, video_id) reminders as sent in one round-trip"""
+        if not sent:
+            return True
 
-Stay active!
-Your Fitness App Team
-"""
+        from database_service import dbs
 
-            if self.send_email(reminder["email"], "Your Workout Reminder", email_body):
-                return self.mark_reminder_sent(reminder)
-            return False
-        except Exception as e:
-            logger.error(f"Error processing reminder: {str(e)}")
-            return False
-
-    def mark_reminder_sent(self, reminder: Dict[str, Any]) -> bool:
-        """Mark reminder as sent in database"""
+        conn = None
         try:
             conn = dbs.get_connection()
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    UPDATE schedule 
-                    SET is_sent = TRUE 
-                    WHERE email = %s AND video_id = %s
-                """,
-                    (reminder["email"], reminder["video_id"]),
-                )
-                conn.commit()
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                UPDATE schedule 
+                SET is_sent = TRUE 
+                WHERE email = %s AND video_id = %s
+            """,
+                sent,
+            )
+            conn.commit()
+            cursor.close()
             return True
         except Exception as e:
-            logger.error(f"Failed to mark reminder as sent: {str(e)}")
+            logger.error(f"Failed to mark reminders as sent: {str(e)}")
             return False
         finally:
             if conn:
                 conn.close()
 
+    def process_due_reminders(self, current_time: str) -> int:
+        """Send every reminder due at current_time and mark the sent ones"""
+        from database_service import dbs
+
+        reminders = dbs.get_due_reminders_with_workouts(current_time)
+        if not reminders:
+            return 0
+
+        logger.info(f"Processing {len(reminders)} reminders")
+
+        # One message per workout (chunked), since every recipient gets the same body
+        workouts: Dict[str, Dict[str, Any]] = {}
+        by_workout: Dict[str, List[str]] = {}
+        for r in reminders:
+            workouts.setdefault(r["video_id"], r)
+            by_workout.setdefault(r["video_id"], []).append(r["email"])
+        groups = [
+            (workouts[video_id], emails[i : i + self.max_recipients])
+            for video_id, emails in by_workout.items()
+            for i in range(0, len(emails), self.max_recipients)
+        ]
+
+        try:
+            if len(groups) == 1:
+                # A single message gains nothing from a worker thread
+                workout, emails = groups[0]
+                accepted = self.process_reminder_group(workout, emails)
+                sent = [(email, workout["video_id"]) for email in accepted]
+            else:
+                workers = min(self.pool_size, len(groups))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(
+                            self.process_reminder_group, workout, emails
+                        ): workout
+                        for workout, emails in groups
+                    }
+                    sent = [
+                        (email, futures[f]["video_id"])
+                        for f in as_completed(futures)
+                        for email in f.result()
+                    ]
+        finally:
+            self.close_smtp_connections()
+        self.mark_reminders_sent(sent)
+        logger.info(f"Successfully processed {len(sent)}/{len(reminders)} reminders")
+        return len(sent)
+
     def check_and_send_reminders(self):
-        """Main scheduler loop to check and send reminders"""
+        """Main scheduler loop: sleep until the next reminder is due, then send"""
+        from database_service import dbs
+
         logger.info("Starting reminder scheduler")
 
         while True:
-            current_time = self.get_current_time()
-            logger.debug(f"Checking reminders at {current_time}")
-
             try:
-                reminders = self.get_due_reminders(current_time)
-                if reminders:
-                    logger.info(f"Processing {len(reminders)} reminders")
-                    success_count = sum(self.process_reminder(r) for r in reminders)
-                    logger.info(
-                        f"Successfully processed {success_count}/{len(reminders)} reminders"
+                now = datetime.now()
+                next_due = dbs.get_next_reminder_datetime(now)
+                wait = (next_due - now).total_seconds() if next_due else None
+                if wait is None or wait > self.max_sleep:
+                    # Nothing due soon; wake up to catch newly saved reminders
+                    time.sleep(self.max_sleep)
+                    continue
+
+                # Monotonic end of the due minute, immune to wall-clock adjustments.
+                # wait is negative if we woke after the minute began, so don't clamp
+                deadline = time.monotonic() + wait + 60
+                time.sleep(max(0, wait))
+                due_time = next_due.strftime("%H:%M")
+                logger.debug(f"Checking reminders at {due_time}")
+                self.process_due_reminders(due_time)
+
+                # Reminders match whole minutes, so don't look again until the next one
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+                else:
+                    logger.warning(
+                        f"Reminder batch for {due_time} overran by {-remaining:.0f}s"
                     )
 
-                # Sleep until next minute
-                time.sleep(60 - datetime.now().second)
-
             except Exception as e:
                 logger.error(f"Scheduler error: {str(e)}")
                 time.sleep(60)  # Wait before retrying
 
-    def get_due_reminders(self, current_time: str) -> list:
-        """Fetch due reminders from database"""
-        conn = None
-        try:
-            conn = dbs.get_connection()
-            with conn.cursor(dictionary=True) as cursor:
-                cursor.execute(
-                    """
-                    SELECT * FROM schedule 
-                    WHERE time = %s AND is_sent = FALSE
-                """,
-                    (current_time,),
-                )
-                return cursor.fetchall()
-        except Exception as e:
-            logger.error(f"Error fetching reminders: {str(e)}")
-            return []
-        finally:
-            if conn:
-                conn.close()
-
 
 def manual_test():
     """Test email sending functionality"""
@@ -197,19 +318,42 @@ def manual_test():
 If you're receiving this, the email scheduler is working correctly!"""
 
     success = scheduler.send_email(test_email, "Fitness App Test Email", test_body)
+    scheduler.close_smtp_connections()
 
     print(f"\nTest {'succeeded' if success else 'failed'}")
 
 
-if __name__ == "__main__":
-    print("Fitness Reminder Email Scheduler")
-    print("1. Run scheduler")
-    print("2. Test email sending")
-    choice = input("Select option (1/2): ")
+def _init_config():
+    """Load .env settings; only the CLI entrypoint needs to do this"""
+    from dotenv import load_dotenv
 
-    if choice == "2":
+    load_dotenv()
+
+
+def run_once() -> int:
+    """Send the reminders due this minute and exit (for cron or a systemd timer)"""
+    scheduler = EmailScheduler()
+    return scheduler.process_due_reminders(scheduler.get_current_time())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fitness Reminder Email Scheduler. Without options, sends the "
+        "reminders due this minute and exits."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and send reminders as they fall due",
+    )
+    mode.add_argument("--test", action="store_true", help="Send a test email")
+    args = parser.parse_args()
+    _init_config()
+
+    if args.test:
         manual_test()
-    else:
+    elif args.daemon:
         scheduler = EmailScheduler()
         try:
             scheduler.check_and_send_reminders()
@@ -217,3 +361,5 @@ if __name__ == "__main__":
             logger.info("Scheduler stopped by user")
         except Exception as e:
             logger.error(f"Scheduler crashed: {str(e)}")
+    else:
+        run_once()
@@ -1,15 +1,15 @@
 """
 User data export utility
-Exports all users to CSV with enhanced security and data handling
+Exports all users to Parquet or gzipped CSV with enhanced security and data handling
 """
 
-import pandas as pd
-from database_service import dbs
 from datetime import datetime
+import csv
+import gzip
 import os
 import logging
-from typing import Tuple, Optional
-import hashlib
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Optional
+import secrets
 
 # Configure logging
 logging.basicConfig(
@@ -22,86 +22,187 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Supported export formats and their file extensions
+EXPORT_FORMATS = {"parquet": ".parquet", "csv": ".csv.gz"}
 
-def secure_filename(base: str) -> str:
-    """Generate a secure filename with hash suffix"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    hash_suffix = hashlib.sha256(timestamp.encode()).hexdigest()[:8]
-    return f"{base}_{timestamp}_{hash_suffix}.csv"
 
+def secure_filename(base: str, extension: str = ".csv") -> str:
+    """Generate a secure filename with a random suffix"""
+    return f"{base}_{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(4)}{extension}"
 
-def sanitize_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove or mask sensitive user data"""
+
+def sanitize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove or mask sensitive fields of a single user row"""
     # Remove sensitive columns completely
-    sensitive_cols = ["password_hash", "google_id", "auth_token"]
-    for col in sensitive_cols:
-        if col in df.columns:
-            del df[col]
+    for col in ("password_hash", "google_id", "auth_token"):
+        row.pop(col, None)
+
+    # Mask email local part, keeping the @domain
+    email = row.get("email")
+    if email:
+        row["email"] = email[0] + "***" + email[email.find("@") :]
+
+    return row
+
+
+def user_batches(export_meta: str) -> Iterator[List[Dict[str, Any]]]:
+    """Yield sanitized users one database batch at a time"""
+    from database_service import dbs
+
+    for batch in dbs.iter_users():
+        for row in batch:
+            sanitize_row(row)
 
-    # Mask email domains (optional)
-    if "email" in df.columns:
-        df["email"] = df["email"].apply(lambda x: x[0] + "***" + x[x.find("@") :])
+            # Add export metadata
+            row["_export_meta"] = export_meta
+            row["_export_version"] = "1.1"
+        yield batch
 
-    return df
 
+def _parquet_schema(pa, batch: List[Dict[str, Any]]) -> Tuple[Any, List[str]]:
+    """
+    Build the Parquet schema for the export from the users table column types
 
-def export_users(output_dir: str = "user_exports") -> Tuple[bool, Optional[str]]:
+    pyarrow infers a column that is NULL throughout the first batch as type null,
+    and then rejects any later batch that has a value there. Known columns use
+    their DDL types; any other column is inferred, falling back to string (the
+    returned names) when the first batch has no values for it.
+    """
+    known = {
+        "user_id": pa.string(),
+        "email": pa.string(),
+        "full_name": pa.string(),
+        "is_verified": pa.int8(),  # BOOLEAN is TINYINT(1) in MySQL
+        "created_at": pa.int64(),
+        "_export_meta": pa.string(),
+        "_export_version": pa.string(),
+    }
+    fields, stringified = [], []
+    for name in batch[0]:
+        type_ = known.get(name)
+        if type_ is None:
+            type_ = pa.array([row.get(name) for row in batch]).type
+            if pa.types.is_null(type_):
+                type_ = pa.string()
+                stringified.append(name)
+        fields.append(pa.field(name, type_))
+    return pa.schema(fields), stringified
+
+
+def write_parquet(f: BinaryIO, batches: Iterator[List[Dict[str, Any]]]) -> int:
+    """Write batches as zstd-compressed Parquet row groups, returning the row count"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    stringified: List[str] = []
+    total = 0
+    try:
+        for batch in batches:
+            if writer is None:
+                schema, stringified = _parquet_schema(pa, batch)
+                writer = pq.ParquetWriter(f, schema, compression="zstd")
+            for name in stringified:
+                for row in batch:
+                    value = row.get(name)
+                    if value is not None and not isinstance(value, str):
+                        row[name] = str(value)
+            writer.write_table(pa.Table.from_pylist(batch, schema=writer.schema))
+            total += len(batch)
+    finally:
+        if writer:
+            writer.close()
+    return total
+
+
+def write_csv_gz(f: BinaryIO, batches: Iterator[List[Dict[str, Any]]]) -> int:
+    """Write batches as one gzip-compressed CSV, returning the row count"""
+    writer = None
+    total = 0
+    with gzip.open(f, "wt", encoding="utf-8-sig", newline="") as text:
+        for batch in batches:
+            if writer is None:
+                writer = csv.DictWriter(
+                    text, fieldnames=list(batch[0]), extrasaction="ignore"
+                )
+                writer.writeheader()
+            writer.writerows(batch)
+            total += len(batch)
+    return total
+
+
+def export_users(
+    output_dir: str = "user_exports", output_format: Optional[str] = None
+) -> Tuple[bool, Optional[str]]:
     """
-    Export all users to CSV with enhanced security measures
+    Export all users with enhanced security measures
 
     Args:
         output_dir: Directory to save exports (default: 'user_exports')
+        output_format: 'parquet' or 'csv' (default: EXPORT_FORMAT env or 'parquet')
 
     Returns:
         Tuple (success: bool, file_path: str or None)
     """
+    output_format = (output_format or os.getenv("EXPORT_FORMAT", "parquet")).lower()
+    if output_format not in EXPORT_FORMATS:
+        logger.error(f"Unsupported export format: {output_format}")
+        return False, None
+
+    created = False
     try:
         # Secure directory creation
         os.makedirs(output_dir, exist_ok=True)
         os.chmod(output_dir, 0o700)  # More restrictive permissions
 
-        logger.info("Fetching user data...")
-        users = dbs.get_all_users()
-
-        if not users:
-            logger.warning("No users found in database")
-            return False, None
-
-        df = pd.DataFrame(users)
-
-        # Data sanitization
-        df = sanitize_data(df)
-
-        # Add export metadata
-        df["_export_meta"] = f"Exported at {datetime.now().isoformat()}"
-        df["_export_version"] = "1.1"
-
         # Generate secure filename
-        filename = secure_filename("users")
+        filename = secure_filename("users", EXPORT_FORMATS[output_format])
         filepath = os.path.join(output_dir, filename)
 
-        # Export with validation
-        df.to_csv(filepath, index=False, encoding="utf-8-sig")
+        # Stream users in batches so only one batch is in memory at a time
+        logger.info("Fetching user data...")
+        batches = user_batches(f"Exported at {datetime.now().isoformat()}")
+
+        # Create the file owner read/write only; O_EXCL refuses an existing path
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        created = True
+        with os.fdopen(fd, "wb") as f:
+            if output_format == "parquet":
+                total = write_parquet(f, batches)
+            else:
+                total = write_csv_gz(f, batches)
+
+        if not total:
+            logger.warning("No users found in database")
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+            return False, None
 
-        # Post-export verification
-        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+        # Post-export verification (one stat call covers existence and size)
+        try:
+            size = os.stat(filepath).st_size
+        except FileNotFoundError:
+            size = 0
+        if size == 0:
             raise IOError("Export file verification failed")
 
-        # Set file permissions (owner read/write only)
-        os.chmod(filepath, 0o600)
-
-        logger.info(f"Successfully exported {len(df)} users to {filepath}")
+        logger.info(f"Successfully exported {total} users to {filepath}")
         return True, filepath
 
     except Exception as e:
         logger.error(f"Export failed: {str(e)}", exc_info=True)
         # Clean up potentially partial files
-        if "filepath" in locals() and os.path.exists(filepath):
+        if created and os.path.exists(filepath):
             os.remove(filepath)
         return False, None
 
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
     logger.info("=== Starting user data export ===")
     success, path = export_users()
 
@@ -1,91 +1,117 @@
 import streamlit as st
-import base64
+import mmap
+
+try:
+    # SIMD-accelerated, and returns str directly without a bytes copy to decode
+    from pybase64 import b64encode_as_string as _b64encode_str
+except ImportError:
+    import base64
+
+    def _b64encode_str(data) -> str:
+        return base64.b64encode(data).decode("ascii")
 
 
 # --- BACKGROUND IMAGE ---
+# Layout styles; static, so they're kept apart from the large encoded image
+_STATIC_CSS = """
+    <style>
+        html {
+            scroll-behavior: smooth;
+        }
+        .stApp {
+            background-size: cover;
+            background-position: center;
+            background-repeat: no-repeat;
+            overflow-x: hidden;
+        }
+        .hero-container {
+            background-color: rgba(0, 0, 0, 0.6);
+            padding: 120px 40px 80px 40px;
+            border-radius: 20px;
+            text-align: center;
+            margin-top: 60px;
+        }
+        .how-it-works-container {
+            background-color: rgba(0, 0, 0, 0.6);
+            padding: 80px 40px 60px 40px;
+            border-radius: 20px;
+            margin-top: 40px;
+            margin-bottom: 60px;
+        }
+        .hero-title {
+            font-size: 60px;
+            color: white;
+            font-weight: bold;
+            margin-bottom: 20px;
+        }
+        .hero-subtitle {
+            font-size: 22px;
+            color: #f0f0f0;
+            margin-bottom: 40px;
+        }
+        .custom-btn {
+            padding: 15px 30px;
+            font-size: 18px;
+            border-radius: 10px;
+            background: white;
+            color: black;
+            border: none;
+            cursor: pointer;
+            margin: 10px;
+            font-weight: bold;
+        }
+        .custom-btn:hover {
+            background: darkred;
+        }
+        .card {
+            background-color: white;
+            color: black;
+            border-radius: 16px;
+            padding: 30px 25px;
+            width: 280px;
+            text-align: center;
+            box-shadow: 0 8px 16px rgba(0,0,0,0.2);
+        }
+        .card h3 {
+            font-size: 26px;
+            margin-bottom: 15px;
+        }
+        .card p {
+            font-size: 17px;
+        }
+    </style>
+    """
+
+# Only the background image rule depends on the (base64-encoded) file
+_BG_CSS = """
+    <style>
+        .stApp {{
+            background-image: url("data:image/png;base64,{encoded}");
+        }}
+    </style>
+    """
+
+
+@st.cache_resource
+def _bg_style(image_file: str) -> str:
+    """Read, encode and render the background CSS once per process"""
+    # Encode straight from the mapped file rather than a read() copy of it
+    with open(image_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        encoded = _b64encode_str(data)
+    return _BG_CSS.format(encoded=encoded)
+
+
 def set_bg(image_file):
-    with open(image_file, "rb") as image:
-        encoded = base64.b64encode(image.read()).decode()
-    st.markdown(
-        f"""
-        <style>
-            html {{
-                scroll-behavior: smooth;
-            }}
-            .stApp {{
-                background-image: url("data:image/png;base64,{encoded}");
-                background-size: cover;
-                background-position: center;
-                background-repeat: no-repeat;
-                overflow-x: hidden;
-            }}
-            .hero-container {{
-                background-color: rgba(0, 0, 0, 0.6);
-                padding: 120px 40px 80px 40px;
-                border-radius: 20px;
-                text-align: center;
-                margin-top: 60px;
-            }}
-            .how-it-works-container {{
-                background-color: rgba(0, 0, 0, 0.6);
-                padding: 80px 40px 60px 40px;
-                border-radius: 20px;
-                margin-top: 40px;
-                margin-bottom: 60px;
-            }}
-            .hero-title {{
-                font-size: 60px;
-                color: white;
-                font-weight: bold;
-                margin-bottom: 20px;
-            }}
-            .hero-subtitle {{
-                font-size: 22px;
-                color: #f0f0f0;
-                margin-bottom: 40px;
-            }}
-            .custom-btn {{
-                padding: 15px 30px;
-                font-size: 18px;
-                border-radius: 10px;
-                background: white;
-                color: black;
-                border: none;
-                cursor: pointer;
-                margin: 10px;
-                font-weight: bold;
-            }}
-            .custom-btn:hover {{
-                background: darkred;
-            }}
-            .card {{
-                background-color: white;
-                color: black;
-                border-radius: 16px;
-                padding: 30px 25px;
-                width: 280px;
-                text-align: center;
-                box-shadow: 0 8px 16px rgba(0,0,0,0.2);
-            }}
-            .card h3 {{
-                font-size: 26px;
-                margin-bottom: 15px;
-            }}
-            .card p {{
-                font-size: 17px;
-            }}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    # Streamlit drops elements a rerun doesn't emit, so both blocks go out each time
+    st.markdown(_STATIC_CSS, unsafe_allow_html=True)
+    st.markdown(_bg_style(image_file), unsafe_allow_html=True)
 
 
 # --- HERO SECTION ---
-def hero_section():
-    set_bg("assets/barbell.jpg")
-
-    st.markdown(
-        """
+# Static markup is built once at import; st.html skips the markdown parser
+_HERO_HTML = """
         <div class="hero-container">
             <div class="hero-title">Your Fitness Reminder</div>
             <div class="hero-subtitle">
@@ -101,16 +127,17 @@ def hero_section():
                 </a>
             </div>
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def hero_section():
+    set_bg("assets/barbell.jpg")
+    st.html(_HERO_HTML)
 
 
 # --- HOW IT WORKS SECTION ---
-def how_it_works():
-    st.markdown("<div id='how-it-works'></div>", unsafe_allow_html=True)
-    st.markdown(
-        """
+_HOW_IT_WORKS_HTML = """
+        <div id='how-it-works'></div>
         <div class="how-it-works-container">
             <h2 style='text-align:center; color:white; font-size: 40px;'>How It Works</h2>
             <div style="display: flex; justify-content: center; flex-wrap: wrap; gap: 40px; margin-top: 60px;">
@@ -128,23 +155,25 @@ def how_it_works():
                 </div>
             </div>
         </div>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def how_it_works():
+    st.html(_HOW_IT_WORKS_HTML)
 
 
 # --- FOOTER ---
-def footer():
-    st.markdown(
-        """
+_FOOTER_HTML = """
         <div style='background-color: #111; color: white; padding: 30px; text-align: center; border-radius: 10px;'>
             <p>📧 Gmail: yourfitnessapp@gmail.com | 📞 Phone: +977-98XXXXXXXX</p>
             <p>© 2025 Your Fitness Reminder. All rights reserved.</p>
         </div>
         <br>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def footer():
+    st.html(_FOOTER_HTML)
 
 
 # --- MAIN LANDING PAGE ---
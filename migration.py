@@ -4,115 +4,190 @@ Handles both time format conversion and schema migrations
 """
 
 from database_service import dbs
-from datetime import datetime
+from mysql.connector import Error, errorcode
+import functools
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, Optional, Tuple
 import sys
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("migration.log", mode="a"), logging.StreamHandler()],
+    handlers=[
+        # delay: the log file isn't opened until the first record is written
+        logging.FileHandler("migration.log", mode="a", delay=True),
+        logging.StreamHandler(),
+    ],
 )
 logger = logging.getLogger(__name__)
 
 
 # ====================== Time Format Migration ======================
-def get_all_schedules() -> List[Dict]:
-    """Safe wrapper to get all schedules with error handling"""
-    try:
-        return dbs.get_all_schedules() or []
-    except Exception as e:
-        logger.error(f"Failed to fetch schedules: {str(e)}")
-        return []
+# Rows per UPDATE statement; bounds the statement size and bound parameters
+_UPDATE_BATCH_SIZE = 1000
 
 
 def convert_time_format(time_str: str) -> str:
     """Convert 12-hour format to 24-hour format with validation"""
-    try:
-        if not time_str or ":" not in time_str:
-            return time_str
+    # Most rows are already "HH:MM", so reject them before the cached parser
+    if not time_str or " " not in time_str or ":" not in time_str:
+        return time_str
+    return _parse_12_hour(time_str)
+
 
-        if " " in time_str:  # Contains AM/PM
-            dt = datetime.strptime(time_str, "%I:%M %p")
-            return dt.strftime("%H:%M")
-        return time_str  # Already in 24-hour format
+# There are only 1440 distinct "HH:MM AM/PM" strings, so conversions are memoized
+@functools.lru_cache(maxsize=2880)
+def _parse_12_hour(time_str: str) -> str:
+    """Parse "HH:MM AM/PM" into "HH:MM"; malformed input is returned unchanged"""
+    try:
+        hour, rest = time_str.split(":", 1)
+        minute, period = rest.split(" ", 1)
+        hour, minute, period = int(hour), int(minute), period.strip().upper()
+        if not (1 <= hour <= 12 and 0 <= minute <= 59 and period in ("AM", "PM")):
+            raise ValueError("expected HH:MM AM/PM")
+        hour = hour % 12 + (12 if period == "PM" else 0)
+        return f"{hour:02d}:{minute:02d}"
     except ValueError as e:
-        logger.error(f"Time format conversion failed for '{time_str}': {str(e)}")
+        logger.error("Time format conversion failed for '%s': %s", time_str, e)
         return time_str
 
 
 def migrate_schedules() -> Dict[str, int]:
     """Migrate all schedules to 24-hour format with transaction support"""
     stats = {"total": 0, "converted": 0, "failed": 0, "unchanged": 0, "invalid": 0}
+    conn = None
 
     try:
-        schedules = get_all_schedules()
-        stats["total"] = len(schedules)
-
-        if not schedules:
-            logger.info("No schedules found for migration")
-            return stats
-
         conn = dbs.get_connection()
         cursor = conn.cursor()
 
-        for schedule in schedules:
-            original_time = schedule.get("time", "")
+        # Plain tuples, streamed from the unbuffered cursor rather than fetched
+        cursor.execute("SELECT id, email, time FROM schedule")
+        updates = []
+        for schedule_id, email, original_time in cursor:
+            stats["total"] += 1
             new_time = convert_time_format(original_time)
 
             if not new_time or new_time == original_time:
-                stats["unchanged"] += 1
+                # A 12-hour time that is still unconverted couldn't be parsed
+                if original_time and " " in original_time:
+                    stats["invalid"] += 1
+                else:
+                    stats["unchanged"] += 1
                 continue
 
+            updates.append((schedule_id, new_time, email))
+
+        if not stats["total"]:
+            logger.info("No schedules found for migration")
+            return stats
+
+        # executemany would still send one UPDATE per row, so each chunk goes out
+        # as a single UPDATE ... CASE statement
+        for start in range(0, len(updates), _UPDATE_BATCH_SIZE):
+            batch = updates[start : start + _UPDATE_BATCH_SIZE]
+            cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+            ids = ", ".join(["%s"] * len(batch))
+            params = [
+                v for schedule_id, new_time, _ in batch for v in (schedule_id, new_time)
+            ]
+            params += [schedule_id for schedule_id, _, _ in batch]
             try:
                 cursor.execute(
-                    """UPDATE schedule SET time = %s
-                    WHERE email = %s AND video_id = %s""",
-                    (new_time, schedule["email"], schedule["video_id"]),
-                )
-                stats["converted"] += 1
-                logger.info(
-                    f"Converted {schedule['email']}: {original_time} → {new_time}"
+                    f"UPDATE schedule SET time = CASE id {cases} END "
+                    f"WHERE id IN ({ids})",
+                    params,
                 )
+                stats["converted"] += len(batch)
             except Exception as e:
-                conn.rollback()
-                stats["failed"] += 1
-                logger.error(f"Failed to update {schedule['email']}: {str(e)}")
-
+                # A failed statement changes no rows, so the batch can be retried
+                # row by row to isolate the bad ones
+                logger.warning("Batch update failed, retrying per row: %s", e)
+                for schedule_id, new_time, email in batch:
+                    try:
+                        cursor.execute(
+                            "UPDATE schedule SET time = %s WHERE id = %s",
+                            (new_time, schedule_id),
+                        )
+                        stats["converted"] += 1
+                    except Exception as e:
+                        stats["failed"] += 1
+                        logger.error("Failed to update %s: %s", email, e)
+
+        logger.info("Converted %d schedules to 24-hour format", stats["converted"])
         conn.commit()
         return stats
 
     except Exception as e:
-        logger.critical(f"Migration aborted: {str(e)}")
-        if "conn" in locals():
+        logger.critical("Migration aborted: %s", e)
+        if conn:
             conn.rollback()
         return stats
     finally:
-        if "conn" in locals():
+        if conn:
             conn.close()
 
 
-# ====================== Schema Migrations ======================
-def add_verification_column() -> Tuple[bool, str]:
-    """Add is_verified column to users table if it doesn't exist"""
+def migrate_schedules_sql_only() -> Optional[Dict[str, int]]:
+    """Convert 12-hour schedule times in one server-side UPDATE
+
+    Returns None on failure, or if any row is still in 12-hour format, so the
+    caller can fall back to the Python migration.
+    """
     conn = None
     try:
         conn = dbs.get_connection()
         cursor = conn.cursor()
-
-        # Check if column exists
+        # No parameters are bound, so the % in the format strings is passed as-is
         cursor.execute(
             """
-            SELECT COUNT(*) FROM information_schema.columns
-            WHERE table_name = 'users' AND column_name = 'is_verified'
+            UPDATE schedule
+            SET time = DATE_FORMAT(STR_TO_DATE(time, '%h:%i %p'), '%H:%i')
+            WHERE time LIKE '% %'
+            AND STR_TO_DATE(time, '%h:%i %p') IS NOT NULL
         """
         )
-        if cursor.fetchone()[0] > 0:
-            return True, "Column already exists"
+        converted = cursor.rowcount
+        conn.commit()
+        logger.info("Converted %d schedules to 24-hour format in SQL", converted)
 
-        # Add the column
+        # Rows STR_TO_DATE couldn't parse (e.g. "13:00 PM") were skipped above
+        cursor.execute(
+            "SELECT COUNT(*), COALESCE(SUM(time LIKE '% %'), 0) FROM schedule"
+        )
+        total, remaining = (int(n) for n in cursor.fetchone())
+        if remaining:
+            logger.warning(
+                "%d schedules still in 12-hour format after SQL conversion", remaining
+            )
+            return None
+        return {
+            "total": total,
+            "converted": converted,
+            "failed": 0,
+            "unchanged": total - converted,
+            "invalid": 0,
+        }
+
+    except Exception as e:
+        # e.g. strict SQL mode rejecting a malformed time; the Python path skips it
+        logger.warning("Server-side time conversion failed: %s", e)
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+# ====================== Schema Migrations ======================
+def add_verification_column() -> Tuple[bool, str]:
+    """Add is_verified column to users table if it doesn't exist"""
+    conn = None
+    try:
+        conn = dbs.get_connection()
+        cursor = conn.cursor()
         cursor.execute(
             """
             ALTER TABLE users
@@ -122,8 +197,11 @@ def add_verification_column() -> Tuple[bool, str]:
         conn.commit()
         return True, "Added is_verified column"
 
-    except Exception as e:
-        logger.error(f"Failed to add column: {str(e)}")
+    except Error as e:
+        # MySQL has no ADD COLUMN IF NOT EXISTS, so the duplicate error means done
+        if e.errno == errorcode.ER_DUP_FIELDNAME:
+            return True, "Column already exists"
+        logger.error("Failed to add column: %s", e)
         if conn:
             conn.rollback()
         return False, str(e)
@@ -132,16 +210,65 @@ def add_verification_column() -> Tuple[bool, str]:
             conn.close()
 
 
+def add_schedule_is_sent_column() -> Tuple[bool, str]:
+    """Add is_sent column to schedule table if it doesn't exist"""
+    conn = None
+    try:
+        conn = dbs.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            ALTER TABLE schedule
+            ADD COLUMN is_sent BOOLEAN DEFAULT FALSE
+        """
+        )
+        conn.commit()
+        return True, "Added is_sent column"
+
+    except Error as e:
+        if e.errno == errorcode.ER_DUP_FIELDNAME:
+            return True, "Column already exists"
+        logger.error("Failed to add column: %s", e)
+        return False, str(e)
+    finally:
+        if conn:
+            conn.close()
+
+
+def add_schedule_time_index() -> Tuple[bool, str]:
+    """Index schedule.time, which the reminder scheduler filters on every minute"""
+    conn = None
+    try:
+        conn = dbs.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("CREATE INDEX idx_schedule_time ON schedule (time)")
+        conn.commit()
+        return True, "Added idx_schedule_time index"
+
+    except Error as e:
+        if e.errno == errorcode.ER_DUP_KEYNAME:
+            return True, "Index already exists"
+        logger.error("Failed to add index: %s", e)
+        return False, str(e)
+    finally:
+        if conn:
+            conn.close()
+
+
 # ====================== Migration Runner ======================
 def run_migrations() -> Dict[str, Dict]:
     """Execute all pending migrations"""
     results = {}
 
     # Schema migrations
-    results["schema"] = {"add_verification_column": add_verification_column()}
+    results["schema"] = {
+        "add_verification_column": add_verification_column(),
+        "add_schedule_is_sent_column": add_schedule_is_sent_column(),
+        "add_schedule_time_index": add_schedule_time_index(),
+    }
 
-    # Data migrations
-    results["time_conversion"] = migrate_schedules()
+    # Data migrations; the row-by-row Python path is only a fallback
+    results["time_conversion"] = migrate_schedules_sql_only() or migrate_schedules()
 
     return results
 
@@ -173,5 +300,5 @@ if __name__ == "__main__":
         print_results(results)
         logger.info("All migrations completed")
     except Exception as e:
-        logger.critical(f"Migration failed: {str(e)}")
+        logger.critical("Migration failed: %s", e)
         sys.exit(1)
@@ -15,8 +15,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class SMTPSender:
+    """Context manager holding one authenticated SMTP session for many sends"""
+
+    def __init__(self, host: str, port: int, user: str, password: str):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.server = None
+
+    def __enter__(self) -> "SMTPSender":
+        # A timeout keeps a stalled server from hanging the caller indefinitely
+        self.server = smtplib.SMTP(self.host, self.port, timeout=10)
+        try:
+            self.server.starttls(context=ssl.create_default_context())
+            self.server.login(self.user, self.password)
+        except Exception:
+            self.server.close()
+            raise
+        return self
+
+    def send(self, msg: MIMEText) -> None:
+        """Send one message over the open session"""
+        self.server.send_message(msg)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            self.server.close()
+
+
 def send_test_email() -> bool:
-    """Send a test email using configured SMTP settings"""
+    """Send a test email to each TEST_RECIPIENT (comma-separated) over one session"""
     load_dotenv()  # Load environment variables
 
     # Get configuration from environment
@@ -33,26 +65,29 @@ def send_test_email() -> bool:
         logger.error("Missing SMTP configuration in .env file")
         return False
 
+    recipients = [r.strip() for r in smtp_config["to_email"].split(",") if r.strip()]
+
     try:
-        # Create secure email message
-        msg = MIMEText(
-            f"This is a test email sent at {datetime.now()}\n\n"
-            "If you received this, your email configuration is working correctly!",
-            "plain",
-            "utf-8",
-        )
-        msg["Subject"] = "Fitness App Test Email"
-        msg["From"] = f"Fitness App <{smtp_config['user']}>"
-        msg["To"] = smtp_config["to_email"]
-
-        # Create secure SMTP connection
-        context = ssl.create_default_context()
-        with smtplib.SMTP(smtp_config["server"], smtp_config["port"]) as server:
-            server.starttls(context=context)
-            server.login(smtp_config["user"], smtp_config["password"])
-            server.send_message(msg)
-
-        logger.info(f"Test email successfully sent to {smtp_config['to_email']}")
+        with SMTPSender(
+            smtp_config["server"],
+            smtp_config["port"],
+            smtp_config["user"],
+            smtp_config["password"],
+        ) as sender:
+            for to_email in recipients:
+                # Create secure email message
+                msg = MIMEText(
+                    f"This is a test email sent at {datetime.now()}\n\n"
+                    "If you received this, your email configuration is working "
+                    "correctly!",
+                    "plain",
+                    "utf-8",
+                )
+                msg["Subject"] = "Fitness App Test Email"
+                msg["From"] = f"Fitness App <{smtp_config['user']}>"
+                msg["To"] = to_email
+                sender.send(msg)
+                logger.info(f"Test email successfully sent to {to_email}")
         return True
 
     except smtplib.SMTPException as e:
@@ -73,4 +108,4 @@ if __name__ == "__main__":
     print("SMTP_PORT=587")
     print("SMTP_USER=your@email.com")
     print("SMTP_PASS=your_password")
-    print("TEST_RECIPIENT=recipient@example.com")
+    print("TEST_RECIPIENT=recipient@example.com  # or a comma-separated list")
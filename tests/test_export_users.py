@@ -0,0 +1,41 @@
+import io
+import os
+import sys
+import types
+import unittest
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# export_users only needs dbs.iter_users; keep the test independent of MySQL
+sys.modules.setdefault("database_service", types.SimpleNamespace(dbs=None))
+
+import export_users  # noqa: E402
+
+
+class WriteParquetTest(unittest.TestCase):
+    def test_first_batch_with_all_null_columns(self):
+        """Columns NULL in every first-batch row still accept later values"""
+        batches = [
+            [
+                {"user_id": "a", "full_name": None, "created_at": None, "extra": None},
+                {"user_id": "b", "full_name": None, "created_at": None, "extra": None},
+            ],
+            [{"user_id": "c", "full_name": "Cee", "created_at": 1700, "extra": 5}],
+        ]
+        buf = io.BytesIO()
+
+        total = export_users.write_parquet(buf, iter(batches))
+
+        self.assertEqual(total, 3)
+        rows = pq.read_table(io.BytesIO(buf.getvalue())).to_pylist()
+        self.assertEqual(
+            rows[2],
+            {"user_id": "c", "full_name": "Cee", "created_at": 1700, "extra": "5"},
+        )
+        self.assertIsNone(rows[0]["full_name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
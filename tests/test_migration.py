@@ -0,0 +1,45 @@
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# convert_time_format is pure; keep the test independent of MySQL
+_connector = types.ModuleType("mysql.connector")
+_connector.Error = Exception
+_connector.errorcode = types.SimpleNamespace()
+sys.modules.setdefault("mysql", types.ModuleType("mysql"))
+sys.modules.setdefault("mysql.connector", _connector)
+sys.modules.setdefault("database_service", types.SimpleNamespace(dbs=None))
+
+from migration import convert_time_format  # noqa: E402
+
+
+class ConvertTimeFormatTest(unittest.TestCase):
+    def test_converts_12_hour_times(self):
+        for time_str, expected in (
+            ("12:00 AM", "00:00"),
+            ("12:30 PM", "12:30"),
+            ("1:05 AM", "01:05"),
+            ("11:59 PM", "23:59"),
+            ("7:15 pm", "19:15"),
+            ("07:15 Am", "07:15"),
+        ):
+            with self.subTest(time_str=time_str):
+                self.assertEqual(convert_time_format(time_str), expected)
+
+    def test_leaves_24_hour_and_empty_values(self):
+        for time_str in ("00:00", "19:15", "noon", "", None):
+            with self.subTest(time_str=time_str):
+                self.assertEqual(convert_time_format(time_str), time_str)
+
+    def test_returns_malformed_times_unchanged(self):
+        for time_str in ("13:00 PM", "0:30 AM", "12:60 AM", "7:15 XM", "7:1x PM"):
+            with self.subTest(time_str=time_str):
+                with self.assertLogs("migration", "ERROR"):
+                    self.assertEqual(convert_time_format(time_str), time_str)
+
+
+if __name__ == "__main__":
+    unittest.main()
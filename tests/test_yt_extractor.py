@@ -0,0 +1,90 @@
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No network or yt_dlp needed: URL and date parsing never call into it
+_yt_dlp = types.ModuleType("yt_dlp")
+_yt_dlp.YoutubeDL = lambda opts: types.SimpleNamespace(close=lambda: None)
+_yt_dlp.utils = types.SimpleNamespace(DownloadError=Exception)
+sys.modules.setdefault("yt_dlp", _yt_dlp)
+sys.modules.setdefault("yt_dlp.utils", _yt_dlp.utils)
+
+from yt_extractor import YouTubeExtractor  # noqa: E402
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+class ExtractVideoIdTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = YouTubeExtractor()
+
+    def test_accepted_urls(self):
+        for url in (
+            f"https://www.youtube.com/watch?v={VIDEO_ID}",
+            f"http://youtube.com/watch?v={VIDEO_ID}&t=42s",
+            f"youtube.com/watch?v={VIDEO_ID}",
+            f"https://m.youtube.com/watch?v={VIDEO_ID}",
+            f"https://youtu.be/{VIDEO_ID}",
+            f"https://youtu.be/{VIDEO_ID}?si=abc",
+            f"https://www.youtube.com/shorts/{VIDEO_ID}",
+            f"https://www.youtube.com/live/{VIDEO_ID}?feature=share",
+            f"https://www.youtube.com/embed/{VIDEO_ID}",
+            f"https://www.youtube.com/v/{VIDEO_ID}",
+            f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}",
+            f"https://youtube-nocookie.com/watch?v={VIDEO_ID}",
+            f"https://www.youtube.com/watch/?v={VIDEO_ID}",
+            f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.extractor._extract_video_id(url), VIDEO_ID)
+
+    def test_rejected_urls(self):
+        for url in (
+            None,
+            "",
+            f"ftp://youtube.com/watch?v={VIDEO_ID}",
+            f"https://youtu.com/watch?v={VIDEO_ID}",
+            f"https://youtube.be/{VIDEO_ID}",
+            f"https://youtu.be/embed/{VIDEO_ID}",
+            f"https://www.youtube.com/{VIDEO_ID}",
+            f"https://www.youtube.com/watch?list={VIDEO_ID}",
+            f"https://www.youtube.com/watch?v={VIDEO_ID[:10]}",
+            "https://www.youtube.com/watch?v=dQw4w9WgXc!",
+            f"https://vimeo.com/watch?v={VIDEO_ID}",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(self.extractor._extract_video_id(url))
+
+
+class ParseDateTest(unittest.TestCase):
+    def test_valid_dates(self):
+        self.assertEqual(YouTubeExtractor._parse_date("20240131"), "2024-01-31")
+        self.assertEqual(YouTubeExtractor._parse_date("20240229"), "2024-02-29")
+        self.assertEqual(YouTubeExtractor._parse_date("20000229"), "2000-02-29")
+
+    def test_invalid_dates(self):
+        for date_str in (
+            None,
+            "",
+            "20230229",  # Not a leap year
+            "19000229",  # Century, not divisible by 400
+            "20240230",
+            "20240431",
+            "20241301",
+            "20240001",
+            "20240100",
+            "00000101",
+            "2024011",
+            "2024-1-1",
+            "２０２４０１０１",  # Full-width digits pass isdigit() alone
+        ):
+            with self.subTest(date_str=date_str):
+                self.assertIsNone(YouTubeExtractor._parse_date(date_str))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,15 @@
+import atexit
 import yt_dlp
 from yt_dlp.utils import DownloadError
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, NamedTuple, Tuple
+from collections import OrderedDict
+import functools
 import logging
-from datetime import datetime
-import re
+import calendar
+import string
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure structured logging
 logging.basicConfig(
@@ -18,6 +23,62 @@ logging.basicConfig(
 logger = logging.getLogger("YouTubeExtractor")
 
 
+# (prefix, offset) pairs: URL starts, after the scheme, any www./m. subdomain and
+# mapping youtube-nocookie.com to youtube.com, that end where the 11-character
+# video ID begins. Most common first.
+_ID_PREFIXES = tuple(
+    (prefix, len(prefix))
+    for prefix in (
+        "youtube.com/watch?v=",
+        "youtu.be/",
+        "youtube.com/shorts/",
+        "youtube.com/live/",
+        "youtube.com/embed/",
+        "youtube.com/v/",
+    )
+)
+_VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# get_info results are reused for this long; bounds staleness of is_live and views
+_INFO_CACHE_TTL = 300
+_INFO_CACHE_SIZE = 512
+
+
+class VideoMeta(NamedTuple):
+    """Standardized metadata for one video, as returned by get_info"""
+
+    video_id: str
+    title: str
+    channel: str
+    duration: int  # Seconds
+    views: int
+    thumbnail: Optional[str]
+    is_live: bool
+    upload_date: Optional[str]  # ISO format
+    categories: Tuple[str, ...]  # Tuples, so cached entries can't be mutated
+    tags: Tuple[str, ...]
+    duration_text: str  # HH:MM:SS or MM:SS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metadata as a plain dict, e.g. for dbs.add_workout"""
+        data = self._asdict()
+        data["categories"] = list(self.categories)
+        data["tags"] = list(self.tags)
+        return data
+
+
+def _clean_text(text: str) -> str:
+    """Clean and normalize text fields"""
+    if not text:
+        return ""
+    # Already clean: no whitespace but single inner spaces
+    if text.isprintable() and "  " not in text and text[0] != " " != text[-1]:
+        return text
+    return " ".join(text.split())
+
+
 class YouTubeExtractor:
     """
     Enhanced YouTube video metadata extractor with:
@@ -39,23 +100,66 @@ class YouTubeExtractor:
             "retries": 3,
             "sleep_interval": 5,  # Seconds between retries
         }
+        # One long-lived instance keeps its HTTP connections alive between calls
         self.ydl = yt_dlp.YoutubeDL(self.ydl_opts)
-        self.url_regex = re.compile(
-            r"(https?://)?(www\.)?"
-            r"(youtube|youtu|youtube-nocookie)\.(com|be)/"
-            r"(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})"
-        )
-        self.last_request_time = 0
-        self.request_delay = 2  # Seconds between requests
+        atexit.register(self.ydl.close)
+        # Token bucket: bursts of up to `burst` requests, then `refill_rate` per second
+        self.burst = 5
+        self.refill_rate = 0.5
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._rate_lock = threading.Lock()
+        # YoutubeDL isn't thread-safe, so batch workers each get their own instance
+        self._local = threading.local()
+        # video_id -> (expiry on the monotonic clock, metadata), oldest use first
+        self._cache: "OrderedDict[str, Tuple[float, VideoMeta]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def validate_url(self, url: str) -> bool:
         """Validate YouTube URL format with strict checks"""
+        return self._extract_video_id(url) is not None
+
+    def _extract_video_id(self, url: str) -> Optional[str]:
+        """Return the 11-character video ID from a YouTube URL, or None"""
         if not url or not isinstance(url, str):
-            return False
-        match = self.url_regex.match(url)
-        return bool(match and len(match.group(6)) == 11)  # Verify video ID length
+            return None
+
+        scheme, sep, rest = url.partition("://")
+        if not sep:
+            rest = url
+        elif scheme not in ("http", "https"):
+            return None
+
+        if rest.startswith(("www.", "m.")):
+            rest = rest.partition(".")[2]
+        if rest.startswith("youtube-nocookie.com/"):
+            rest = "youtube.com/" + rest.partition("/")[2]
+
+        for prefix, offset in _ID_PREFIXES:
+            if rest.startswith(prefix):
+                break
+        else:
+            # Any other youtube.com path with a v= query parameter, e.g.
+            # watch?feature=share&v=ID or watch/?v=ID
+            if not rest.startswith("youtube.com/"):
+                return None
+            query = rest.find("?")
+            if query == -1:
+                return None
+            if rest.startswith("v=", query + 1):
+                offset = query + 3
+            else:
+                offset = rest.find("&v=", query)
+                if offset == -1:
+                    return None
+                offset += 3
+
+        video_id = rest[offset : offset + 11]
+        if len(video_id) == 11 and _VIDEO_ID_CHARS.issuperset(video_id):
+            return video_id
+        return None
 
-    def get_info(self, url: str) -> Optional[Dict[str, Any]]:
+    def get_info(self, url: str) -> Optional[VideoMeta]:
         """
         Extract and sanitize video information with retry logic
 
@@ -63,22 +167,33 @@ class YouTubeExtractor:
             url: Valid YouTube URL
 
         Returns:
-            Dict: Standardized video metadata including:
+            VideoMeta: Standardized video metadata including:
                 - video_id, title, channel, duration (seconds)
-                - thumbnail_url, view_count, upload_date
+                - thumbnail, views, upload_date
                 - is_live (bool), duration_text (HH:MM:SS)
             None if extraction fails after retries
         """
-        if not self.validate_url(url):
+        video_id = self._extract_video_id(url)
+        if video_id is None:
             logger.error(f"Invalid YouTube URL format: {url}")
             return None
 
+        info = self._cache_get(video_id)
+        if info is None:
+            info = self._fetch(video_id)
+            if info is not None:
+                self._cache_put(video_id, info)
+        return info
+
+    def _fetch(self, video_id: str) -> Optional[VideoMeta]:
+        """Download and sanitize the metadata of one video"""
         self._respect_rate_limit()
 
         try:
-            with self.ydl:
-                result = self.ydl.extract_info(url, download=False)
-                return self._process_result(result) if result else None
+            result = self._get_ydl().extract_info(
+                f"https://www.youtube.com/watch?v={video_id}", download=False
+            )
+            return self._process_result(result) if result else None
 
         except DownloadError as e:
             logger.error(f"Download failed: {str(e)}")
@@ -86,68 +201,137 @@ class YouTubeExtractor:
             logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         return None
 
+    def _get_ydl(self) -> yt_dlp.YoutubeDL:
+        """Return the shared YoutubeDL, or this batch worker's own instance"""
+        instances = getattr(self._local, "batch_instances", None)
+        if instances is None:
+            return self.ydl
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = yt_dlp.YoutubeDL(self.ydl_opts)
+            instances.append(ydl)
+        return ydl
+
+    def _cache_get(self, video_id: str) -> Optional[VideoMeta]:
+        """Return the cached metadata for video_id, unless expired"""
+        with self._cache_lock:
+            entry = self._cache.get(video_id)
+            if entry is None:
+                return None
+            expires, info = entry
+            if expires <= time.monotonic():
+                del self._cache[video_id]
+                return None
+            self._cache.move_to_end(video_id)
+            return info
+
+    def _cache_put(self, video_id: str, info: VideoMeta):
+        """Cache metadata for video_id, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._cache[video_id] = (time.monotonic() + _INFO_CACHE_TTL, info)
+            self._cache.move_to_end(video_id)
+            if len(self._cache) > _INFO_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def get_info_batch(
+        self, urls: List[str], max_workers: int = 8
+    ) -> List[Optional[VideoMeta]]:
+        """
+        Extract info for many URLs concurrently; results keep the input order
+
+        Requests still pass through the shared token bucket, so workers only
+        overlap network waits. YouTube tends to answer HTTP 429 beyond about
+        4-8 concurrent extractions, so keep max_workers in that range.
+        """
+        if not urls:
+            return []
+
+        instances: List[yt_dlp.YoutubeDL] = []
+
+        def worker(url: str) -> Optional[VideoMeta]:
+            # _get_ydl creates this thread's instance only on a cache miss
+            self._local.batch_instances = instances
+            return self.get_info(url)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+                return list(pool.map(worker, urls))
+        finally:
+            for ydl in instances:
+                ydl.close()
+
     def _respect_rate_limit(self):
-        """Enforce minimum delay between requests"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.request_delay:
-            time.sleep(self.request_delay - elapsed)
-        self.last_request_time = time.time()
+        """Take a request token, sleeping only when the bucket is empty"""
+        # Held while sleeping so concurrent callers are spaced out, not bunched
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last_refill) * self.refill_rate
+            )
+            self._last_refill = now
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self.refill_rate)
+                self._tokens = 1.0
+                self._last_refill = time.monotonic()
+            self._tokens -= 1
 
-    def _process_result(self, result: Dict) -> Optional[Dict[str, Any]]:
+    def _process_result(self, result: Dict) -> Optional[VideoMeta]:
         """Process and standardize the extracted data"""
         if "entries" in result:  # Handle playlists/channels
-            videos = [e for e in result["entries"] if e and "id" in e]
-            if not videos:
+            # Use first video in playlist; stop scanning as soon as it's found
+            result = next((e for e in result["entries"] if e and "id" in e), None)
+            if result is None:
                 logger.warning("No valid videos found in playlist")
                 return None
-            result = videos[0]  # Use first video in playlist
 
         return self._sanitize_metadata(result) if "id" in result else None
 
-    def _sanitize_metadata(self, video: Dict) -> Dict[str, Any]:
+    def _sanitize_metadata(self, video: Dict) -> VideoMeta:
         """Convert and standardize video metadata"""
-        metadata = {
-            "video_id": video.get("id"),
-            "title": self._clean_text(video.get("title", "Untitled")),
-            "channel": self._clean_text(video.get("uploader", "Unknown")),
-            "duration": int(video.get("duration", 0)),
-            "views": int(video.get("view_count", 0)),
-            "thumbnail": video.get("thumbnail"),
-            "is_live": bool(video.get("is_live", False)),
-            "upload_date": self._parse_date(video.get("upload_date")),
-            "categories": video.get("categories", []),
-            "tags": video.get("tags", []),
-        }
-
-        # Add formatted duration
-        metadata["duration_text"] = self._format_duration(metadata["duration"])
-        return metadata
-
-    @staticmethod
-    def _clean_text(text: str) -> str:
-        """Clean and normalize text fields"""
-        if not text:
-            return ""
-        return " ".join(text.strip().split())  # Remove extra whitespace
+        # Live streams and premieres report None for these; int(None) would raise
+        duration = video.get("duration")
+        views = video.get("view_count")
+        duration = int(duration) if isinstance(duration, (int, float)) else 0
+        return VideoMeta(
+            video_id=video.get("id"),
+            title=_clean_text(video.get("title", "Untitled")),
+            channel=_clean_text(video.get("uploader", "Unknown")),
+            duration=duration,
+            views=int(views) if isinstance(views, (int, float)) else 0,
+            thumbnail=video.get("thumbnail"),
+            is_live=bool(video.get("is_live", False)),
+            upload_date=self._parse_date(video.get("upload_date")),
+            categories=tuple(video.get("categories") or ()),
+            tags=tuple(video.get("tags") or ()),
+            duration_text=self._format_duration(duration),
+        )
 
     @staticmethod
     def _parse_date(date_str: Optional[str]) -> Optional[str]:
         """Convert YYYYMMDD to ISO format"""
-        if not date_str or len(date_str) != 8:
+        if (
+            not date_str
+            or len(date_str) != 8
+            or not (date_str.isascii() and date_str.isdigit())
+        ):
             return None
-        try:
-            return datetime.strptime(date_str, "%Y%m%d").date().isoformat()
-        except ValueError:
+        year, month, day = int(date_str[:4]), int(date_str[4:6]), int(date_str[6:])
+        if not (year and 1 <= month <= 12 and 1 <= day <= _DAYS_IN_MONTH[month - 1]):
+            return None
+        if month == 2 and day == 29 and not calendar.isleap(year):
             return None
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)  # Workout durations repeat across listings
     def _format_duration(seconds: int) -> str:
         """Convert seconds to HH:MM:SS or MM:SS"""
+        if seconds < 3600:  # Most workouts; no hours field to compute
+            minutes = seconds // 60
+            return f"{minutes}:{seconds - minutes * 60:02d}"
         hours, remainder = divmod(seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
-        if hours > 0:
-            return f"{hours}:{minutes:02d}:{seconds:02d}"
-        return f"{minutes}:{seconds:02d}"
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
 
 
 # Module-level instance for easy import